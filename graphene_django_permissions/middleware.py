@@ -1,31 +1,340 @@
-from typing import Type
+import functools
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
 
 import graphql
+from django.conf import settings
 from django.db import models
+from django.utils.module_loading import import_string
 
 
 class PermissionDenied(graphql.GraphQLError):
     pass
 
 
+# Permission names are derived entirely from a model's (static) metadata, so we cache
+# them rather than rebuilding the same strings for every object in every response
+@functools.lru_cache(maxsize=None)
 def get_permission_for_model(model: Type[models.Model], action: str) -> str:
     app_label = model._meta.app_label
     model_name = model._meta.model_name
     return f"{app_label}.{action}_{model_name}"
 
 
+@functools.lru_cache(maxsize=None)
 def get_view_permission_for_model(model: Type[models.Model]) -> str:
     return get_permission_for_model(model, "view")
 
 
+@functools.lru_cache(maxsize=None)
+def _uses_default_has_perm(user_class: type) -> bool:
+    """
+    Determine whether users of the given class use Django's standard `has_perm`
+    (`PermissionsMixin.has_perm`), which grants active superusers all permissions without
+    consulting any authorization backends.
+    """
+    # Import this here rather than at the module level, since it requires the app
+    # registry to be ready
+    from django.contrib.auth.models import PermissionsMixin
+
+    return getattr(user_class, "has_perm", None) is PermissionsMixin.has_perm
+
+
+def _is_active_superuser(user) -> bool:
+    # Active superusers are granted all permissions by Django's standard `has_perm`, so we
+    # can skip permission checks entirely for them. A user model that overrides
+    # `has_perm` may restrict what superusers can see, though, so we only take this
+    # shortcut for models using the standard implementation. (Not all user models have
+    # an `is_superuser` field, so we can't assume it's present.)
+    return bool(
+        user.is_active
+        and getattr(user, "is_superuser", False)
+        # Use `__class__` rather than `type()`, which would return the wrapper class for a
+        # lazily-loaded user (like Django's `request.user`)
+        and _uses_default_has_perm(user.__class__)
+    )
+
+
 def has_permission_to_view_model_object(user, object: models.Model) -> bool:
-    model = object._meta.model
+    if _is_active_superuser(user):
+        return True
+
+    # Note that an instance's type is always its model class (`object._meta.model`),
+    # including for proxy models, but is much cheaper to look up
+    model = type(object)
     # Check if the user has access to all objects for this model, or this specific
     # object.
     permission = get_view_permission_for_model(model)
     return user.has_perm(permission) or user.has_perm(permission, obj=object)
 
 
+class _PermissionCache:
+    """
+    Permission-check results for a user, cached for the duration of a request.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.is_active_superuser = _is_active_superuser(user)
+        self.may_have_object_permissions = _supports_object_permissions(
+            user.__class__, tuple(settings.AUTHENTICATION_BACKENDS)
+        )
+        # Maps (permission, object primary key) to whether the user has that
+        # permission, where a primary key of None represents the model-level check
+        self.results: Dict[Tuple[str, Optional[Any]], bool] = {}
+
+
+def _get_permission_cache(context) -> _PermissionCache:
+    """
+    Get the cache of permission-check results for the current user, scoped to the
+    current request (the GraphQL context), so that any given check is performed at most
+    once per request, no matter how many fields in the response it applies to.
+    """
+    user = context.user
+    cache: Optional[_PermissionCache] = getattr(
+        context, "_graphene_django_permissions_cache", None
+    )
+    if cache is None or cache.user is not user:
+        # Start with a fresh cache if this is the first check in this request, or if
+        # the user has changed since the cache was created (e.g., a login mutation)
+        cache = _PermissionCache(user)
+        context._graphene_django_permissions_cache = cache
+    return cache
+
+
+def _has_model_permission(context, permission: str) -> bool:
+    """
+    Check whether the user has the given permission for *all* objects of a model, using
+    the request-scoped cache.
+    """
+    cache = _get_permission_cache(context)
+    if cache.is_active_superuser:
+        return True
+
+    key = (permission, None)
+    try:
+        return cache.results[key]
+    except KeyError:
+        has_perm = cache.results[key] = context.user.has_perm(permission)
+        return has_perm
+
+
+@functools.lru_cache(maxsize=None)
+def _supports_object_permissions(
+    user_class: type, backend_paths: Tuple[str, ...]
+) -> bool:
+    """
+    Determine whether users of the given class could possibly be granted object-level
+    permissions with the given authorization backends.
+
+    Django's built-in backends only ever grant model-level permissions, so if those are
+    all that's configured (and the user model uses Django's standard `has_perm`), every
+    object-level check is guaranteed to fail, and we can skip performing them.
+    """
+    # Import these here rather than at the module level, since they require the app
+    # registry to be ready
+    from django.contrib.auth import backends
+    from django.contrib.auth.models import AnonymousUser, PermissionsMixin
+
+    if getattr(user_class, "has_perm", None) not in (
+        PermissionsMixin.has_perm,
+        AnonymousUser.has_perm,
+    ):
+        # The user model has its own custom permission logic
+        return True
+
+    model_level_only_backends = (
+        backends.ModelBackend,
+        backends.AllowAllUsersModelBackend,
+        backends.RemoteUserBackend,
+        backends.AllowAllUsersRemoteUserBackend,
+    )
+    for backend_path in backend_paths:
+        backend = import_string(backend_path)
+        # Like Django, ignore any backends that don't implement `has_perm`
+        if hasattr(backend, "has_perm") and backend not in model_level_only_backends:
+            return True
+
+    return False
+
+
+def _may_have_object_permissions(context) -> bool:
+    return _get_permission_cache(context).may_have_object_permissions
+
+
+def _has_object_permission(context, permission: str, object: models.Model) -> bool:
+    """
+    Check whether the user has the given permission for this specific object, using the
+    request-scoped cache (keyed by the object's primary key), so that the same object
+    appearing in multiple places in the response is only checked once.
+    """
+    if not _may_have_object_permissions(context):
+        return False
+
+    if object.pk is None:
+        # Unsaved objects can't be identified reliably, so don't cache them
+        return context.user.has_perm(permission, obj=object)
+
+    cache = _get_permission_cache(context)
+    key = (permission, object.pk)
+    try:
+        return cache.results[key]
+    except KeyError:
+        has_perm = cache.results[key] = context.user.has_perm(permission, obj=object)
+        return has_perm
+
+
+def _has_permission_to_view_model_object(context, object: models.Model) -> bool:
+    """
+    The same as `has_permission_to_view_model_object`, but using the request-scoped
+    cache for both the model-level and object-level permission checks.
+    """
+    permission = get_view_permission_for_model(type(object))
+    return _has_model_permission(context, permission) or _has_object_permission(
+        context, permission, object
+    )
+
+
+def _filter_permitted_objects(context, objects: Iterable[Any]) -> List[Any]:
+    """
+    Filter the given objects to those that aren't model objects, or are model objects
+    that the user has permission to view.
+
+    The objects are typically all of the same model (or a handful of models), so the
+    permission name and model-level permission check for each model are looked up just
+    once, rather than once per object.
+    """
+    # Maps each model to its view permission and whether the user has that permission
+    # for all objects of the model
+    model_permissions: Dict[Type[models.Model], Tuple[str, bool]] = {}
+
+    def is_permitted(obj: Any) -> bool:
+        if not isinstance(obj, models.Model):
+            return True
+
+        model = type(obj)
+        try:
+            permission, has_model_permission = model_permissions[model]
+        except KeyError:
+            permission = get_view_permission_for_model(model)
+            has_model_permission = _has_model_permission(context, permission)
+            model_permissions[model] = (permission, has_model_permission)
+
+        return has_model_permission or _has_object_permission(context, permission, obj)
+
+    return [obj for obj in objects if is_permitted(obj)]
+
+
+@functools.lru_cache(maxsize=None)
+def _is_leaf_type(return_type: graphql.GraphQLOutputType) -> bool:
+    """
+    Whether the given GraphQL field type (ignoring any List/NonNull wrappers) is a scalar
+    or enum, and therefore can't represent model objects that need authorization.
+
+    Since schemas are static, this is cached per type.
+    """
+    return graphql.is_leaf_type(graphql.get_named_type(return_type))
+
+
+def _authorize_model_object(result: models.Model, info) -> Optional[models.Model]:
+    if not _has_permission_to_view_model_object(info.context, result):
+        # The user does not have access to all objects for this model, nor this specific
+        # object. As such, return null for this field.
+
+        if isinstance(info.return_type, graphql.GraphQLNonNull):
+            # If this field the client requested (but doesn't have access to) is
+            # non-nullable in the GraphQL schema, then we're forced to raise an error,
+            # since we can't circumvent the schema at the authorization layer. The rest
+            # of the separate authorized data that satisfies the GQL schema will still
+            # be returned and appear as normal.
+            raise PermissionDenied("You do not have permission to access this field")
+
+        return None
+
+    return result
+
+
+def _authorize_queryset(result: models.QuerySet, info) -> Iterable[models.Model]:
+    model: Type[models.Model] = result.model
+    permission = get_view_permission_for_model(model)
+    if _has_model_permission(info.context, permission):
+        return result
+
+    if not _may_have_object_permissions(info.context):
+        # The user can't have access to any of the objects, so return an empty queryset,
+        # without evaluating this one (sparing the SQL query if it hasn't been evaluated
+        # yet, as with a top-level field)
+        return result.none()
+
+    # The user does not have access to all objects for this model, so we'll filter to
+    # only the specific objects the user can access. Note that we are implicitly
+    # converting the queryset to a list by doing so. This is intentional, since the
+    # query will already have been evaluated and optimized from the top-level (if
+    # graphene_django_optimizer is used), so we effectively pay no SQL cost by iterating
+    # through the results here, unlike if we were to use a `filter` on the queryset or
+    # similar.
+    # (Iterating reuses the queryset's result cache if it's already been evaluated, as
+    # with prefetched relations, so this never re-issues the query. Likewise, `len()`
+    # below is answered from that cache rather than with a COUNT query.)
+    permitted_objects = [
+        obj for obj in result if _has_object_permission(info.context, permission, obj)
+    ]
+    # If the user can access every object, return the (now-evaluated) queryset as-is
+    # rather than a redundant copy of it
+    if len(permitted_objects) == len(result):
+        return result
+    return permitted_objects
+
+
+def _authorize_collection(result: Collection[Any], info) -> Collection[Any]:
+    # Sometimes queries may return a list or other iterable of models, rather than a
+    # QuerySet of models (e.g., if they performed some in-memory filtering on a queryset
+    # and implicitly converted to a list themselves). In this case, we should still
+    # attempt to check permissions on the individual objects. We'll allow (1) any object
+    # that isn't a model object or (2) any model object that the user has permission to
+    # view.
+    if not any(isinstance(obj, models.Model) for obj in result):
+        # There's nothing to authorize (e.g., a list of plain Graphene objects)
+        return result
+
+    permitted_objects = _filter_permitted_objects(info.context, result)
+    # Likewise, avoid returning a copy if nothing was filtered out
+    if len(permitted_objects) == len(result):
+        return result
+    return permitted_objects
+
+
+def _no_authorization_needed(result: Any, info) -> Any:
+    return result
+
+
+@functools.lru_cache(maxsize=None)
+def _get_authorization_handler(result_type: type) -> Callable[[Any, Any], Any]:
+    """
+    Get the function that performs authorization for resolved values of the given type.
+
+    This is cached per type, so that rather than performing a series of isinstance
+    checks for every resolved value, we perform a single lookup (including for scalar
+    values like strings and None, which need no authorization).
+    """
+    if issubclass(result_type, models.Model):
+        return _authorize_model_object
+    if issubclass(result_type, models.QuerySet):
+        return _authorize_queryset
+    if issubclass(result_type, (list, tuple, set)):
+        return _authorize_collection
+    return _no_authorization_needed
+
+
 class GrapheneAuthorizationMiddleware:
     """
     This adds model-level view-authorization logic to Graphene, where for each model in
@@ -34,56 +343,25 @@ class GrapheneAuthorizationMiddleware:
     """
 
     def resolve(self, next, root, info, **args):
+        # Fields with scalar/enum types (like IDs, names, etc.) make up the majority of
+        # a typical response, and never need authorization, so skip all processing
+        if _is_leaf_type(info.return_type):
+            return next(root, info, **args)
+
         # First, get the result for this node in the response
         result = next(root, info, **args)
 
         # Given the resulting value, check whether the current user has view access
-        if isinstance(result, models.Model):
-            if not has_permission_to_view_model_object(info.context.user, result):
-                # The user does not have access to all objects for this model, nor this
-                # specific object. As such, return null for this field.
-
-                if isinstance(info.return_type, graphql.GraphQLNonNull):
-                    # If this field the client requested (but doesn't have access to) is
-                    # non-nullable in the GraphQL schema, then we're forced to raise an
-                    # error, since we can't circumvent the schema at the authorization
-                    # layer. The rest of the separate authorized data that satisfies the
-                    # GQL schema will still be returned and appear as normal.
-                    raise PermissionDenied(
-                        "You do not have permission to access this field"
-                    )
-
-                return None
-
-        elif isinstance(result, models.QuerySet):
-            model = result.model
-            permission = get_view_permission_for_model(model)
-            if not info.context.user.has_perm(permission):
-                # The user does not have access to all objects for this model, so we'll
-                # filter to only the specific objects the user can access. Note that we
-                # are implicitly converting the queryset to a list by doing so. This is
-                # intentional, since the query will already have been evaluated and
-                # optimized from the top-level (if graphene_django_optimizer is used),
-                # so we effectively pay no SQL cost by iterating through the results
-                # here, unlike if we were to use a `filter` on the queryset or similar.
-                return [
-                    obj
-                    for obj in result
-                    if info.context.user.has_perm(permission, obj=obj)
-                ]
-
-        elif isinstance(result, (list, tuple, set)):
-            # Sometimes queries may return a list or other iterable of models, rather
-            # than a QuerySet of models (e.g., if they performed some in-memory
-            # filtering on a queryset and implicitly converted to a list themselves). In
-            # this case, we should still attempt to check permissions on the individual
-            # objects. We'll allow (1) any object that isn't a model object or (2) any
-            # model object that the user has permission to view.
-            return [
-                obj
-                for obj in result
-                if not isinstance(obj, models.Model)
-                or has_permission_to_view_model_object(info.context.user, obj)
-            ]
+        result_type: type = type(result)
+        authorize = _get_authorization_handler(result_type)
+        if authorize is _no_authorization_needed:
+            # Don't access the user for values that need no authorization (e.g., plain
+            # objects, or introspection fields), since the context may not have one
+            return result
 
-        return result
+        # Superusers are permitted to view everything (unless the user model overrides
+        # Django's standard `has_perm`), so there's nothing to check
+        if _get_permission_cache(info.context).is_active_superuser:
+            return result
+
+        return authorize(result, info)
@@ -0,0 +1,12 @@
+import pytest
+
+from tests import utils
+
+
+@pytest.fixture(autouse=True)
+def clear_permission_ids_cache():
+    """
+    Clear the cache of permission ids before each test, since flushing the database
+    (as transactional tests do) recreates the Permission rows with new ids.
+    """
+    utils._PERMISSION_IDS_CACHE.clear()
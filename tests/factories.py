@@ -1,3 +1,5 @@
+from typing import Optional
+
 import factory
 from django.contrib.auth.models import User
 
@@ -6,8 +8,8 @@ from tests.utils import add_permissions_for_user
 
 
 class UserFactory(factory.django.DjangoModelFactory):
-    first_name = factory.Faker("first_name")
-    last_name = factory.Faker("last_name")
+    first_name = factory.Sequence(lambda n: "First%d" % n)
+    last_name = factory.Sequence(lambda n: "Last%d" % n)
     username = factory.Sequence(lambda n: "username%d" % n)
 
     class Meta:
@@ -25,7 +27,7 @@ class UserFactory(factory.django.DjangoModelFactory):
 
 
 class ProjectFactory(factory.django.DjangoModelFactory):
-    name = factory.Faker("sentence")
+    name = factory.Sequence(lambda n: "Project %d" % n)
     owner = factory.SubFactory(UserFactory)
 
     class Meta:
@@ -35,7 +37,25 @@ class ProjectFactory(factory.django.DjangoModelFactory):
 class ExpenseFactory(factory.django.DjangoModelFactory):
     owner = factory.SubFactory(UserFactory)
     project = factory.SubFactory(ProjectFactory)
-    amount = factory.Faker("pyint")
+    amount = factory.Sequence(lambda n: n)
 
     class Meta:
         model = Expense
+
+
+def create_expenses(count: int, project: Project, owner: Optional[User] = None) -> None:
+    """
+    Create the given number of expenses for the project, using a single bulk INSERT.
+
+    Unless an `owner` is given, all of the expenses share a single new owner, rather
+    than each getting their own new user (as with `ExpenseFactory.create_batch`).
+
+    Nothing is returned, since not all database backends set the primary keys of
+    bulk-created objects. Use `ExpenseFactory.create_batch` if the expenses are needed.
+    """
+    if owner is None:
+        owner = UserFactory()
+
+    Expense.objects.bulk_create(
+        ExpenseFactory.build_batch(count, project=project, owner=owner)
+    )
@@ -27,6 +27,17 @@ class User(DjangoObjectType):
         fields = "__all__"
 
 
+class ProjectStatus(graphene.Enum):
+    ACTIVE = "active"
+    ARCHIVED = "archived"
+
+
+class ProjectSummary(graphene.ObjectType):
+    # A plain (non-Django) ObjectType, whose resolver returns a Project model object, to
+    # ensure our authorization middleware still performs permissioning in this scenario
+    name = graphene.String()
+
+
 # Queries
 
 
@@ -39,6 +50,10 @@ class Query(graphene.ObjectType):
     expenses = graphene.List(graphene.NonNull(Expense), required=True)
     users = graphene.List(graphene.NonNull(User), required=True)
 
+    project_summary = graphene.Field(ProjectSummary, id=graphene.ID())
+    project_status = graphene.Field(ProjectStatus, id=graphene.ID())
+    project_name = graphene.String(id=graphene.ID())
+
     @staticmethod
     def resolve_project(root, info, id: str):
         try:
@@ -92,6 +107,19 @@ class Query(graphene.ObjectType):
             info,
         )
 
+    @staticmethod
+    def resolve_project_summary(root, info, id: str):
+        return models.Project.objects.filter(id=id).first()
+
+    @staticmethod
+    def resolve_project_status(root, info, id: str):
+        return ProjectStatus.ACTIVE
+
+    @staticmethod
+    def resolve_project_name(root, info, id: str):
+        project = models.Project.objects.filter(id=id).first()
+        return project.name if project else None
+
 
 # Mutations
 
@@ -35,6 +35,9 @@ GRAPHENE = {
     ],
 }
 
+# Use a fast (insecure) password hasher, since the tests never rely on password strength
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 ROOT_URLCONF = "tests.urls"
@@ -1,19 +1,66 @@
 import re
 
 import pytest
-from django.contrib.auth.backends import BaseBackend
+from django.contrib.auth.backends import BaseBackend, ModelBackend
+from django.contrib.auth.models import PermissionsMixin, User
 from django.test.client import Client
 from graphene_django.utils.testing import graphql_query
 
-from tests.factories import ExpenseFactory, ProjectFactory, UserFactory
+from graphene_django_permissions import middleware
+from graphene_django_permissions.middleware import (
+    GrapheneAuthorizationMiddleware,
+    _supports_object_permissions,
+    has_permission_to_view_model_object,
+)
+from tests.factories import (
+    ExpenseFactory,
+    ProjectFactory,
+    UserFactory,
+    create_expenses,
+)
+from tests.models import Project
+from tests.schema import schema
 from tests.utils import (
     assert_graphql_response_has_errors,
     assert_graphql_response_has_no_errors,
+    execute_graphql_query,
 )
 
 pytestmark = pytest.mark.django_db
 
 
+# The permission sets the tests grant, for viewing every model in the test schema, and for
+# viewing all but expenses or all but projects
+_ALL_VIEW_PERMISSIONS = ("tests.view_project", "tests.view_expense", "auth.view_user")
+_VIEW_PERMISSIONS_EXCEPT_EXPENSES = ("tests.view_project", "auth.view_user")
+_VIEW_PERMISSIONS_EXCEPT_PROJECTS = ("tests.view_expense", "auth.view_user")
+
+
+# The SQL queries we expect, in order, when fetching projects with nested expenses (see
+# `_assert_projects_with_expenses_sql_queries_match_expected`)
+_PROJECTS_WITH_EXPENSES_SQL_PATTERNS = (
+    # Django should have queried for session- and user-data of the logged-in user
+    re.compile(r'SELECT .* FROM "django_session"'),
+    re.compile(r'SELECT .* FROM "auth_user"'),
+    # Django should have fetched all of the user's permissions (their own and their
+    # groups')
+    re.compile(
+        r'SELECT .* FROM "auth_permission" INNER JOIN "auth_user_user_permissions"'
+    ),
+    re.compile(r'SELECT .* FROM "auth_permission" INNER JOIN "auth_group_permissions"'),
+    # We should have queried for all projects, joined with users for the owner data,
+    # using a single query
+    re.compile(r'SELECT .* FROM "tests_project" INNER JOIN "auth_user"'),
+    # We should have queried for all of the expenses of all of the projects, joined with
+    # users for the expense owner data, using a single query
+    re.compile(r'SELECT .* FROM "tests_expense" INNER JOIN "auth_user"'),
+)
+
+
+# The view permissions that OwnerPermittedAuthBackend grants to the owner of an object
+_OWNER_PERMS = frozenset({"tests.view_project", "tests.view_expense"})
+
+
 # For testing object-level permissions, we'll implement our own authorization backend
 # that allows an object's "owner" to view it, even if they do not have sweeping
 # model-level view permissions. (See note here
@@ -26,7 +73,7 @@ class OwnerPermittedAuthBackend(BaseBackend):
         if not obj:
             return super().has_perm(user_obj, perm, obj)
 
-        if perm == "tests.view_project" or perm == "tests.view_expense":
+        if perm in _OWNER_PERMS:
             # Allow a user access to view the specific object if they're the owner of
             # that object
             return obj.owner_id == user_obj.id
@@ -34,6 +81,20 @@ class OwnerPermittedAuthBackend(BaseBackend):
         return super().has_perm(user_obj, perm, obj)
 
 
+@pytest.fixture(autouse=True)
+def clear_object_permissions_support_cache():
+    """
+    Clear the process-wide caches of whether object-level permissions are supported and
+    whether the user model uses Django's standard `has_perm`, since tests change the
+    configured backends and patch the user model's `has_perm`.
+    """
+    _supports_object_permissions.cache_clear()
+    middleware._uses_default_has_perm.cache_clear()
+    yield
+    _supports_object_permissions.cache_clear()
+    middleware._uses_default_has_perm.cache_clear()
+
+
 @pytest.fixture
 def use_owner_permitted_auth_backend(settings):
     """
@@ -46,48 +107,82 @@ def use_owner_permitted_auth_backend(settings):
     ]
 
 
+@pytest.fixture
+def two_projects_with_expenses():
+    """
+    Create a couple projects, with 5 and 2 expenses respectively.
+    """
+    project1 = ProjectFactory()
+    create_expenses(5, project=project1)
+    project2 = ProjectFactory()
+    create_expenses(2, project=project2)
+    return project1, project2
+
+
 class TestGrapheneAuthorizationMiddleware:
     """
     Test that the Graphene authorization middleware properly restricts read access
     depending on user permissions.
     """
 
-    def _project_query(self):
-        return """
-            query ($id: ID!) {
-                project(id: $id) {
+    _PROJECT_QUERY = """
+        query ($id: ID!) {
+            project(id: $id) {
+                id
+                name
+
+                owner {
+                    id
+                    username
+                }
+
+                expenses {
+                    amount
                     id
-                    name
 
                     owner {
                         id
                         username
                     }
+                }
+            }
+        }
+    """
 
-                    expenses {
-                        amount
-                        id
+    _PROJECTS_WITH_EXPENSES_QUERY = """
+        query ProjectsQuery {
+            projects {
+                id
+                name
 
-                        owner {
-                            id
-                            username
-                        }
-                    }
+                owner {
+                    id
+                    username
                 }
-            }
-        """
 
-    def _projects_with_expenses_query(self):
-        return """
-            query ProjectsQuery {
-                projects {
+                expenses {
+                    amount
                     id
-                    name
 
                     owner {
                         id
                         username
                     }
+                }
+            }
+        }
+    """
+
+    # Include nested list of expenses for each project's owner
+    _PROJECT_WITH_OWNER_EXPENSES_QUERY = """
+        query ($id: ID!) {
+            project(id: $id) {
+                id
+                name
+
+                owner {
+                    id
+                    username
 
                     expenses {
                         amount
@@ -100,40 +195,37 @@ class TestGrapheneAuthorizationMiddleware:
                     }
                 }
             }
-        """
+        }
+    """
 
-    def _project_with_owner_expenses_query(self):
-        # Include nested list of expenses for each project's owner
-        return """
-            query ($id: ID!) {
-                project(id: $id) {
-                    id
-                    name
+    # This query is useful to test a response resolver that returns a list rather
+    # than a QuerySet
+    _PROJECTS_RETURNING_LIST_QUERY = """
+        query {
+            projectsList {
+                id
+                name
 
-                    owner {
-                        id
-                        username
-
-                        expenses {
-                            amount
-                            id
+                owner {
+                    id
+                    username
+                }
 
-                            owner {
-                                id
-                                username
-                            }
-                        }
-                    }
+                expenses {
+                    amount
+                    id
                 }
             }
-        """
+        }
+    """
 
-    def _projects_returning_list_query(self):
-        # This query is useful to test a response resolver that returns a list rather
-        # than a QuerySet
-        return """
-            query {
-                projectsList {
+    _EXPENSE_QUERY = """
+        query ($id: ID!) {
+            expense(id: $id) {
+                amount
+                id
+
+                project {
                     id
                     name
 
@@ -141,94 +233,61 @@ class TestGrapheneAuthorizationMiddleware:
                         id
                         username
                     }
-
-                    expenses {
-                        amount
-                        id
-                    }
                 }
             }
-        """
+        }
+    """
 
-    def _expense_query(self):
-        return """
-            query ($id: ID!) {
-                expense(id: $id) {
-                    amount
+    # This mutation is useful to let us verify that we enforce authorization even
+    # for responses from mutations
+    _PROJECT_MUTATION = """
+        mutation (
+            $id: ID!,
+            $input: ProjectUpdateInput!
+        ) {
+            projectUpdate(id: $id, input: $input) {
+                project {
                     id
+                    name
 
-                    project {
+                    owner {
                         id
-                        name
-
-                        owner {
-                            id
-                            username
-                        }
+                        username
                     }
-                }
-            }
-        """
 
-    def _project_mutation(self):
-        # This mutation is useful to let us verify that we enforce authorization even
-        # for responses from mutations
-        return """
-            mutation (
-                $id: ID!,
-                $input: ProjectUpdateInput!
-            ) {
-                projectUpdate(id: $id, input: $input) {
-                    project {
+                    expenses {
+                        amount
                         id
-                        name
 
                         owner {
                             id
                             username
                         }
-
-                        expenses {
-                            amount
-                            id
-
-                            owner {
-                                id
-                                username
-                            }
-                        }
                     }
                 }
             }
-        """
+        }
+    """
 
     def test_top_level_list_and_its_children_are_non_empty_when_have_all_permissions(
-        self, client: Client
+        self, client: Client, django_assert_max_num_queries, two_projects_with_expenses
     ):
         """
         When querying for a list of objects, the list should be non-empty if the user
         has permission, and its various children should be included with permission to
         those.
         """
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "tests.view_expense",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_ALL_VIEW_PERMISSIONS)
         client.force_login(user)
 
-        # Create a couple projects and add expenses to them
-        project1 = ProjectFactory()
-        ExpenseFactory.create_batch(5, project=project1)
-        project2 = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project2)
+        project1, project2 = two_projects_with_expenses
+        project1_id, project2_id = str(project1.id), str(project2.id)
 
-        response = graphql_query(
-            query=self._projects_with_expenses_query(),
-            client=client,
-        )
+        with django_assert_max_num_queries(6):
+            response = graphql_query(
+                query=self._PROJECTS_WITH_EXPENSES_QUERY,
+                client=client,
+            )
 
         assert_graphql_response_has_no_errors(response)
 
@@ -238,44 +297,33 @@ class TestGrapheneAuthorizationMiddleware:
         # All of the projects and expenses should be visible, with their associated user
         # data
         assert len(projects_in_response) == 2
-        assert {project["id"] for project in projects_in_response} == {
-            str(project1.id),
-            str(project2.id),
-        }
+        projects_by_id = {project["id"]: project for project in projects_in_response}
+        assert projects_by_id.keys() == {project1_id, project2_id}
 
-        project1_in_response = next(
-            project
-            for project in projects_in_response
-            if project["id"] == str(project1.id)
-        )
+        project1_in_response = projects_by_id[project1_id]
         assert project1_in_response["owner"] is not None
         assert len(project1_in_response["expenses"]) == 5
         assert project1_in_response["expenses"][0]["owner"] is not None
 
-        project2_in_response = next(
-            project
-            for project in projects_in_response
-            if project["id"] == str(project2.id)
-        )
+        project2_in_response = projects_by_id[project2_id]
         assert project2_in_response["owner"] is not None
         assert len(project2_in_response["expenses"]) == 2
 
     def test_top_level_list_and_its_children_are_non_empty_when_user_is_superuser(
-        self, client: Client
+        self, client: Client, django_assert_max_num_queries, two_projects_with_expenses
     ):
         # Don't assign any specific permissions to a user, just mark them as a superuser
         user = UserFactory(is_superuser=True)
         client.force_login(user)
 
-        project1 = ProjectFactory()
-        ExpenseFactory.create_batch(5, project=project1)
-        project2 = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project2)
+        project1, project2 = two_projects_with_expenses
+        project1_id, project2_id = str(project1.id), str(project2.id)
 
-        response = graphql_query(
-            query=self._projects_with_expenses_query(),
-            client=client,
-        )
+        with django_assert_max_num_queries(4):
+            response = graphql_query(
+                query=self._PROJECTS_WITH_EXPENSES_QUERY,
+                client=client,
+            )
 
         assert_graphql_response_has_no_errors(response)
 
@@ -284,53 +332,61 @@ class TestGrapheneAuthorizationMiddleware:
 
         # All of the projects and expenses should be visible
         assert len(projects_in_response) == 2
-        assert {project["id"] for project in projects_in_response} == {
-            str(project1.id),
-            str(project2.id),
-        }
+        projects_by_id = {project["id"]: project for project in projects_in_response}
+        assert projects_by_id.keys() == {project1_id, project2_id}
 
-        project1_in_response = next(
-            project
-            for project in projects_in_response
-            if project["id"] == str(project1.id)
-        )
+        project1_in_response = projects_by_id[project1_id]
         assert project1_in_response["owner"] is not None
         assert len(project1_in_response["expenses"]) == 5
         assert project1_in_response["expenses"][0]["owner"] is not None
 
-        project2_in_response = next(
-            project
-            for project in projects_in_response
-            if project["id"] == str(project2.id)
-        )
+        project2_in_response = projects_by_id[project2_id]
         assert len(project2_in_response["expenses"]) == 2
 
-    def test_top_level_list_field_is_empty_without_permission(self, client: Client):
+    def test_top_level_list_field_is_empty_without_permission(self):
         """
         When querying for a top-level List field, the list should be empty if the user
         does not have permission to that model.
         """
         # Exclude permissions to view projects, the top-level model
-        user = UserFactory(
-            permissions=[
-                "tests.view_expense",
-                "auth.view_user",
-            ],
-        )
-        client.force_login(user)
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_PROJECTS)
 
         project = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project)
+        create_expenses(2, project=project)
 
-        response = graphql_query(
-            self._projects_with_expenses_query(),
-            client=client,
-        )
+        result = execute_graphql_query(self._PROJECTS_WITH_EXPENSES_QUERY, user)
 
         # There should be no errors, but the top-level list should be empty
+        assert result.errors is None
+        assert result.data == {"projects": []}
+
+    def test_top_level_list_field_is_not_queried_without_permission(
+        self, client: Client, django_assert_num_queries
+    ):
+        """
+        When querying for a top-level List field that the user can't possibly have
+        permission to see any objects of, the list shouldn't be queried at all.
+        """
+        # Exclude permissions to view projects, the top-level model
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_PROJECTS)
+        client.force_login(user)
+
+        project = ProjectFactory()
+        create_expenses(2, project=project)
+
+        # Only the session, user, and permissions queries should be performed
+        with django_assert_num_queries(4) as captured:
+            response = graphql_query(
+                self._PROJECTS_WITH_EXPENSES_QUERY,
+                client=client,
+            )
+
         assert_graphql_response_has_no_errors(response)
         content = response.json()
         assert len(content["data"]["projects"]) == 0
+        assert not any(
+            "tests_project" in query["sql"] for query in captured.captured_queries
+        )
 
     @pytest.mark.usefixtures("use_owner_permitted_auth_backend")
     def test_top_level_list_field_contains_owned_objects_with_object_level_permissions(
@@ -342,25 +398,20 @@ class TestGrapheneAuthorizationMiddleware:
         authorization backend when it's in place.
         """
         # Exclude permissions to view projects, the top-level model
-        user = UserFactory(
-            permissions=[
-                "tests.view_expense",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_PROJECTS)
         client.force_login(user)
 
         # Mark the requesting user as the owner of one project, and only that one should
         # be returned
         project1 = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project1)
+        create_expenses(2, project=project1)
         project2 = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project2)
+        create_expenses(2, project=project2)
         project3 = ProjectFactory(owner=user)  # Owned by the requesting user
-        ExpenseFactory.create_batch(2, project=project3)
+        create_expenses(2, project=project3)
 
         response = graphql_query(
-            self._projects_with_expenses_query(),
+            self._PROJECTS_WITH_EXPENSES_QUERY,
             client=client,
         )
 
@@ -379,12 +430,12 @@ class TestGrapheneAuthorizationMiddleware:
         model.
         """
         project = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project)
+        create_expenses(2, project=project)
 
         # Don't log in any user to the client. The "AnonymousUser" should not have
         # permission to view any projects
         response = graphql_query(
-            self._projects_with_expenses_query(),
+            self._PROJECTS_WITH_EXPENSES_QUERY,
             client=client,
         )
 
@@ -398,20 +449,14 @@ class TestGrapheneAuthorizationMiddleware:
         When querying for a single object field, it should be returned if the user has
         permission to that model.
         """
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "tests.view_expense",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_ALL_VIEW_PERMISSIONS)
         client.force_login(user)
 
         project = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project)
+        create_expenses(2, project=project)
 
         response = graphql_query(
-            self._project_query(),
+            self._PROJECT_QUERY,
             variables={
                 "id": project.id,
             },
@@ -428,61 +473,42 @@ class TestGrapheneAuthorizationMiddleware:
         assert len(project_in_response["expenses"]) == 2
         assert project_in_response["expenses"][0]["owner"] is not None
 
-    def test_top_level_object_field_is_null_without_permission(self, client: Client):
+    def test_top_level_object_field_is_null_without_permission(self):
         """
         When querying for a top-level object field, it should be returned as null if the
         user does not have permission to that model.
         """
         # Exclude permissions to view projects, the top-level model
-        user = UserFactory(
-            permissions=[
-                "tests.view_expense",
-                "auth.view_user",
-            ],
-        )
-        client.force_login(user)
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_PROJECTS)
 
         project = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project)
+        create_expenses(2, project=project)
 
-        response = graphql_query(
-            self._project_query(),
-            variables={
-                "id": project.id,
-            },
-            client=client,
+        result = execute_graphql_query(
+            self._PROJECT_QUERY, user, variables={"id": project.id}
         )
 
         # There should be no errors, but the top-level object should be empty
-        assert_graphql_response_has_no_errors(response)
-        content = response.json()
-        assert content["data"]["project"] is None
+        assert result.errors is None
+        assert result.data == {"project": None}
 
     def test_nested_related_model_list_is_empty_when_missing_permissions(
-        self, client: Client
+        self, client: Client, django_assert_max_num_queries, two_projects_with_expenses
     ):
         """
         When a user doesn't have permission for a nested model that's returned as a
         list, the list should be empty.
         """
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_EXPENSES)
         client.force_login(user)
 
-        # Create a couple projects and add expenses to them
-        project1 = ProjectFactory()
-        ExpenseFactory.create_batch(5, project=project1)
-        project2 = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project2)
+        project1, project2 = two_projects_with_expenses
 
-        response = graphql_query(
-            query=self._projects_with_expenses_query(),
-            client=client,
-        )
+        with django_assert_max_num_queries(6):
+            response = graphql_query(
+                query=self._PROJECTS_WITH_EXPENSES_QUERY,
+                client=client,
+            )
 
         assert_graphql_response_has_no_errors(response)
 
@@ -501,7 +527,7 @@ class TestGrapheneAuthorizationMiddleware:
 
     @pytest.mark.usefixtures("use_owner_permitted_auth_backend")
     def test_nested_related_model_list_includes_owned_objects_with_object_level_permission(
-        self, client: Client
+        self, client: Client, django_assert_max_num_queries
     ):
         """
         Verify that for queried nested/related lists, we return objects that are owned
@@ -509,31 +535,29 @@ class TestGrapheneAuthorizationMiddleware:
         backend when it's in place.
         """
         # Omit the model-level expenses view-permission
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_EXPENSES)
         client.force_login(user)
 
         # Create a couple projects and add expenses to them, including some owned by the
         # requesting user
         project1 = ProjectFactory()
-        ExpenseFactory.create_batch(3, project=project1)
+        create_expenses(3, project=project1)
         project1_user_owned_expenses = ExpenseFactory.create_batch(
             2, project=project1, owner=user
         )
         project2 = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project2)
+        create_expenses(2, project=project2)
         project2_user_owned_expenses = ExpenseFactory.create_batch(
             1, project=project2, owner=user
         )
 
-        response = graphql_query(
-            query=self._projects_with_expenses_query(),
-            client=client,
-        )
+        project1_id, project2_id = str(project1.id), str(project2.id)
+
+        with django_assert_max_num_queries(6):
+            response = graphql_query(
+                query=self._PROJECTS_WITH_EXPENSES_QUERY,
+                client=client,
+            )
 
         assert_graphql_response_has_no_errors(response)
 
@@ -543,27 +567,17 @@ class TestGrapheneAuthorizationMiddleware:
         # The projects should show up, and the list of expenses should match the ones
         # owned by the user
         assert len(projects_in_response) == 2
-        assert {project["id"] for project in projects_in_response} == {
-            str(project1.id),
-            str(project2.id),
-        }
+        projects_by_id = {project["id"]: project for project in projects_in_response}
+        assert projects_by_id.keys() == {project1_id, project2_id}
 
-        project1_in_response = next(
-            project
-            for project in projects_in_response
-            if project["id"] == str(project1.id)
-        )
+        project1_in_response = projects_by_id[project1_id]
         assert project1_in_response["owner"] is not None
         assert len(project1_in_response["expenses"]) == 2
         assert {expense["id"] for expense in project1_in_response["expenses"]} == {
             str(expense.id) for expense in project1_user_owned_expenses
         }
 
-        project2_in_response = next(
-            project
-            for project in projects_in_response
-            if project["id"] == str(project2.id)
-        )
+        project2_in_response = projects_by_id[project2_id]
         assert project2_in_response["owner"] is not None
         assert len(project2_in_response["expenses"]) == 1
         assert {expense["id"] for expense in project2_in_response["expenses"]} == {
@@ -571,33 +585,28 @@ class TestGrapheneAuthorizationMiddleware:
         }
 
     def test_nested_related_model_list_within_child_is_non_empty_with_permission_to_model(
-        self, client: Client
+        self, client: Client, django_assert_max_num_queries
     ):
         """
         Verify that we return a list as non-empty if the user has access to that model,
         even if that list is within a child's relations (nested deeper).
         """
         # Add all the permissions
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "tests.view_expense",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_ALL_VIEW_PERMISSIONS)
         client.force_login(user)
 
         project = ProjectFactory()
         # Add some expenses created by the project owner
         ExpenseFactory.create_batch(2, owner=project.owner)
 
-        response = graphql_query(
-            self._project_with_owner_expenses_query(),
-            variables={
-                "id": project.id,
-            },
-            client=client,
-        )
+        with django_assert_max_num_queries(6):
+            response = graphql_query(
+                self._PROJECT_WITH_OWNER_EXPENSES_QUERY,
+                variables={
+                    "id": project.id,
+                },
+                client=client,
+            )
 
         assert_graphql_response_has_no_errors(response)
 
@@ -612,7 +621,7 @@ class TestGrapheneAuthorizationMiddleware:
         assert len(project_in_response["owner"]["expenses"]) == 2
 
     def test_nested_related_model_list_within_child_is_empty_without_permission_to_model(
-        self, client: Client
+        self, client: Client, django_assert_max_num_queries
     ):
         """
         Verify that we return a list as empty if the user does not have access to that
@@ -620,25 +629,21 @@ class TestGrapheneAuthorizationMiddleware:
         """
         # Add all the permissions, except for expenses, and the list of expenses even
         # *within the project owner* field should end up empty
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_EXPENSES)
         client.force_login(user)
 
         project = ProjectFactory()
         # Add some expenses created by the project owner
         ExpenseFactory.create_batch(2, owner=project.owner)
 
-        response = graphql_query(
-            self._project_with_owner_expenses_query(),
-            variables={
-                "id": project.id,
-            },
-            client=client,
-        )
+        with django_assert_max_num_queries(6):
+            response = graphql_query(
+                self._PROJECT_WITH_OWNER_EXPENSES_QUERY,
+                variables={
+                    "id": project.id,
+                },
+                client=client,
+            )
 
         assert_graphql_response_has_no_errors(response)
 
@@ -661,19 +666,13 @@ class TestGrapheneAuthorizationMiddleware:
         """
         # The project owner is non-nullable, and it should show up fine since the user
         # has permission
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "tests.view_expense",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_ALL_VIEW_PERMISSIONS)
         client.force_login(user)
 
         expense = ExpenseFactory()
 
         response = graphql_query(
-            self._expense_query(),
+            self._EXPENSE_QUERY,
             variables={
                 "id": expense.id,
             },
@@ -716,7 +715,7 @@ class TestGrapheneAuthorizationMiddleware:
         expense = ExpenseFactory()
 
         response = graphql_query(
-            self._expense_query(),
+            self._EXPENSE_QUERY,
             variables={
                 "id": expense.id,
             },
@@ -754,20 +753,14 @@ class TestGrapheneAuthorizationMiddleware:
         """
         # The Expense's project is nullable, and it should show up fine since the user
         # has permission
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "tests.view_expense",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_ALL_VIEW_PERMISSIONS)
         client.force_login(user)
 
         project = ProjectFactory()
         expense = ExpenseFactory(project=project)
 
         response = graphql_query(
-            self._expense_query(),
+            self._EXPENSE_QUERY,
             variables={
                 "id": expense.id,
             },
@@ -791,12 +784,7 @@ class TestGrapheneAuthorizationMiddleware:
         """
         # The Expense's project (a nullable ForeignKey from Expense) should show up as
         # null if the user does not have permission to it
-        user = UserFactory(
-            permissions=[
-                "tests.view_expense",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_PROJECTS)
         client.force_login(user)
 
         project = ProjectFactory()
@@ -804,7 +792,7 @@ class TestGrapheneAuthorizationMiddleware:
         assert expense.project is not None  # Sanity-check
 
         response = graphql_query(
-            self._expense_query(),
+            self._EXPENSE_QUERY,
             variables={
                 "id": expense.id,
             },
@@ -828,21 +816,16 @@ class TestGrapheneAuthorizationMiddleware:
         up in the results, but related queried sub-models should be omitted if not
         permitted.
         """
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_EXPENSES)
         client.force_login(user)
 
         project1 = ProjectFactory()
-        ExpenseFactory.create_batch(3, project=project1)
+        create_expenses(3, project=project1)
         project2 = ProjectFactory()
-        ExpenseFactory.create_batch(1, project=project2)
+        create_expenses(1, project=project2)
 
         response = graphql_query(
-            self._projects_returning_list_query(),
+            self._PROJECTS_RETURNING_LIST_QUERY,
             client=client,
         )
 
@@ -871,22 +854,16 @@ class TestGrapheneAuthorizationMiddleware:
         If the user has permission to the main model as well as related queried
         sub-models, those should show up in the results.
         """
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "tests.view_expense",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_ALL_VIEW_PERMISSIONS)
         client.force_login(user)
 
         project1 = ProjectFactory()
-        ExpenseFactory.create_batch(3, project=project1)
+        create_expenses(3, project=project1)
         project2 = ProjectFactory()
-        ExpenseFactory.create_batch(1, project=project2)
+        create_expenses(1, project=project2)
 
         response = graphql_query(
-            self._projects_returning_list_query(),
+            self._PROJECTS_RETURNING_LIST_QUERY,
             client=client,
         )
 
@@ -909,21 +886,16 @@ class TestGrapheneAuthorizationMiddleware:
     def test_field_returning_list_instead_of_queryset_is_empty_without_permission(
         self, client: Client
     ):
-        user = UserFactory(
-            permissions=[
-                "tests.view_expense",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_PROJECTS)
         client.force_login(user)
 
         project1 = ProjectFactory()
-        ExpenseFactory.create_batch(3, project=project1)
+        create_expenses(3, project=project1)
         project2 = ProjectFactory()
-        ExpenseFactory.create_batch(1, project=project2)
+        create_expenses(1, project=project2)
 
         response = graphql_query(
-            self._projects_returning_list_query(),
+            self._PROJECTS_RETURNING_LIST_QUERY,
             client=client,
         )
 
@@ -941,21 +913,15 @@ class TestGrapheneAuthorizationMiddleware:
         When performing a mutation, the client's response should appear as normal if
         they have permission to all of the models.
         """
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "tests.view_expense",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_ALL_VIEW_PERMISSIONS)
         client.force_login(user)
 
         project = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project)
+        create_expenses(2, project=project)
 
         new_name = "New project name"
         response = graphql_query(
-            self._project_mutation(),
+            self._PROJECT_MUTATION,
             variables={
                 "id": project.id,
                 "input": {"name": new_name},
@@ -985,20 +951,15 @@ class TestGrapheneAuthorizationMiddleware:
         they do not have access to, those should be omitted from the response.
         """
         # Omit the view permission for expenses
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "auth.view_user",
-            ],
-        )
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_EXPENSES)
         client.force_login(user)
 
         project = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project)
+        create_expenses(2, project=project)
 
         new_name = "New project name"
         response = graphql_query(
-            self._project_mutation(),
+            self._PROJECT_MUTATION,
             variables={
                 "id": project.id,
                 "input": {"name": new_name},
@@ -1025,61 +986,72 @@ class TestGrapheneAuthorizationMiddleware:
         Validate that the SQL queries captured are what we expect, when querying for
         projects with nested expenses.
         """
-        assert len(captured.captured_queries) == 6
-
-        # Django should have queried for session- and user-data of the logged-in user
-        assert re.match(
-            r'SELECT .* FROM "django_session"', captured.captured_queries[0]["sql"]
-        )
-        assert re.match(
-            r'SELECT .* FROM "auth_user"', captured.captured_queries[1]["sql"]
-        )
-        # Django should have fetched all of the user's permissions (their own and their
-        # groups')
-        assert re.match(
-            r'SELECT .* FROM "auth_permission" INNER JOIN "auth_user_user_permissions"',
-            captured.captured_queries[2]["sql"],
-        )
-        assert re.match(
-            r'SELECT .* FROM "auth_permission" INNER JOIN "auth_group_permissions"',
-            captured.captured_queries[3]["sql"],
+        assert len(captured.captured_queries) == len(
+            _PROJECTS_WITH_EXPENSES_SQL_PATTERNS
         )
 
-        # We should have queried for all projects, joined with users for the owner data,
-        # using a single query
-        assert re.match(
-            r'SELECT .* FROM "tests_project" INNER JOIN "auth_user"',
-            captured.captured_queries[4]["sql"],
-        )
-
-        # We should have queried for all of the expenses of all of the projects, joined
-        # with users for the expense owner data, using a single query
-        assert re.match(
-            r'SELECT .* FROM "tests_expense" INNER JOIN "auth_user"',
-            captured.captured_queries[5]["sql"],
-        )
-
-    def test_sql_queries_are_still_optimized_when_user_has_permissions(
-        self, client: Client, django_assert_num_queries
+        for query, pattern in zip(
+            captured.captured_queries, _PROJECTS_WITH_EXPENSES_SQL_PATTERNS
+        ):
+            assert pattern.match(query["sql"]), query["sql"]
+
+    @pytest.mark.parametrize(
+        "permissions, use_object_level_permissions, expected_expenses_per_project",
+        [
+            pytest.param(
+                _ALL_VIEW_PERMISSIONS, False, 2, id="when_user_has_permissions"
+            ),
+            # Omit permission to view expenses, which should remove them from the
+            # response
+            pytest.param(
+                _VIEW_PERMISSIONS_EXCEPT_EXPENSES,
+                False,
+                0,
+                id="when_user_is_missing_permissions",
+            ),
+            # Omit permission to view all expenses, but use an authorization backend
+            # with object-level permissions, which should restrict the ones shown to
+            # those that the user owns
+            pytest.param(
+                _VIEW_PERMISSIONS_EXCEPT_EXPENSES,
+                True,
+                1,
+                id="when_using_object_level_permissions",
+            ),
+        ],
+    )
+    def test_sql_queries_are_still_optimized(
+        self,
+        client: Client,
+        django_assert_num_queries,
+        request,
+        permissions,
+        use_object_level_permissions,
+        expected_expenses_per_project,
     ):
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "tests.view_expense",
-                "auth.view_user",
-            ],
-        )
+        if use_object_level_permissions:
+            request.getfixturevalue("use_owner_permitted_auth_backend")
+
+        user = UserFactory(permissions=permissions)
         client.force_login(user)
 
-        # Create a couple projects and add expenses to them
+        # Create a couple projects with two expenses each, one of them owned by the
+        # requesting user. That's enough to catch an N+1 pattern, since the projects'
+        # expenses (and their owners) would then be queried separately per project
         project1 = ProjectFactory()
-        ExpenseFactory.create_batch(3, project=project1)
+        create_expenses(1, project=project1)
+        create_expenses(1, project=project1, owner=user)
         project2 = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project2)
+        create_expenses(1, project=project2)
+        create_expenses(1, project=project2, owner=user)
 
+        # The query-performance should be the same regardless of the user's
+        # permissions. Gating the expenses (whether with model-level or object-level
+        # permissions) should incur no additional SQL hit, since the authorization
+        # backends don't require any additional queries.
         with django_assert_num_queries(6) as captured:
             response = graphql_query(
-                query=self._projects_with_expenses_query(),
+                query=self._PROJECTS_WITH_EXPENSES_QUERY,
                 client=client,
             )
 
@@ -1088,89 +1060,324 @@ class TestGrapheneAuthorizationMiddleware:
         content = response.json()
         projects_in_response = content["data"]["projects"]
         assert len(projects_in_response) == 2
-        assert len(projects_in_response[0]["expenses"]) > 0
+        assert [len(project["expenses"]) for project in projects_in_response] == [
+            expected_expenses_per_project
+        ] * 2
 
+        # The SQL query performance should be the same as when a user has all
+        # permission, still optimized
         self._assert_projects_with_expenses_sql_queries_match_expected(captured)
 
-    def test_sql_queries_are_still_optimized_when_user_is_missing_permissions(
-        self, client: Client, django_assert_num_queries
+    def test_model_level_permissions_are_checked_once_per_request(
+        self, client: Client, monkeypatch
     ):
-        # Omit permission to view expenses, which should remove them from the response
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "auth.view_user",
-            ],
-        )
+        """
+        The model-level permission check for a given model should only be performed
+        once per request, regardless of how many objects of that model are returned.
+        """
+        # Omit the model-level expenses view-permission, so that expenses require
+        # per-object checks
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_EXPENSES)
         client.force_login(user)
 
-        # Create a couple projects and add expenses to them
         project1 = ProjectFactory()
-        ExpenseFactory.create_batch(3, project=project1)
+        create_expenses(3, project=project1)
         project2 = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project2)
+        create_expenses(2, project=project2)
 
-        # The query-performance should be the same as it was when the user had all
-        # permissions. Gating the expenses should incur no additional SQL hit.
-        with django_assert_num_queries(6) as captured:
-            response = graphql_query(
-                query=self._projects_with_expenses_query(),
-                client=client,
-            )
+        model_level_checks = []
+        original_has_perm = User.has_perm
+
+        def has_perm(self, perm, obj=None):
+            if obj is None:
+                model_level_checks.append(perm)
+            return original_has_perm(self, perm, obj=obj)
+
+        monkeypatch.setattr(User, "has_perm", has_perm)
+
+        response = graphql_query(
+            query=self._PROJECTS_WITH_EXPENSES_QUERY,
+            client=client,
+        )
+
+        assert_graphql_response_has_no_errors(response)
+        assert sorted(model_level_checks) == [
+            "auth.view_user",
+            "tests.view_expense",
+            "tests.view_project",
+        ]
+
+    @pytest.mark.usefixtures("use_owner_permitted_auth_backend")
+    def test_object_level_permissions_are_checked_once_per_request(
+        self, client: Client, monkeypatch
+    ):
+        """
+        The object-level permission check for a given object should only be performed
+        once per request, even if that object appears multiple times in the response.
+        """
+        # Omit the model-level projects view-permission, so that projects require
+        # per-object checks
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_PROJECTS)
+        client.force_login(user)
+
+        project = ProjectFactory(owner=user)
+
+        object_level_checks = []
+        original_has_perm = User.has_perm
+
+        def has_perm(self, perm, obj=None):
+            if obj is not None:
+                object_level_checks.append((perm, obj.pk))
+            return original_has_perm(self, perm, obj=obj)
+
+        monkeypatch.setattr(User, "has_perm", has_perm)
+
+        # Request the same project via two separate fields
+        response = graphql_query(
+            """
+            query ($id: ID!) {
+                first: project(id: $id) {
+                    id
+                }
+                second: project(id: $id) {
+                    id
+                }
+            }
+            """,
+            variables={
+                "id": project.id,
+            },
+            client=client,
+        )
 
-        # Sanity-check that the response was valid
         assert_graphql_response_has_no_errors(response)
         content = response.json()
-        projects_in_response = content["data"]["projects"]
-        assert len(projects_in_response) == 2
-        # Expenses should be empty since the user does not have permission to view them
-        assert len(projects_in_response[0]["expenses"]) == 0
+        assert content["data"]["first"]["id"] == str(project.id)
+        assert content["data"]["second"]["id"] == str(project.id)
+        assert object_level_checks == [("tests.view_project", project.pk)]
 
-        # The SQL query performance should be the same as when a user has all
-        # permission, still optimized
-        self._assert_projects_with_expenses_sql_queries_match_expected(captured)
+    def test_object_level_permissions_are_not_checked_without_object_level_backend(
+        self, client: Client, monkeypatch
+    ):
+        """
+        If none of the configured authorization backends can grant object-level
+        permissions, we shouldn't bother performing object-level permission checks.
+        """
+        # Omit the model-level expenses view-permission
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_EXPENSES)
+        client.force_login(user)
 
-    @pytest.mark.usefixtures("use_owner_permitted_auth_backend")
-    def test_sql_queries_are_still_optimized_when_using_object_level_permissions(
-        self, client: Client, django_assert_num_queries
+        project = ProjectFactory()
+        create_expenses(3, project=project)
+
+        object_level_checks = []
+        original_has_perm = ModelBackend.has_perm
+
+        def has_perm(self, user_obj, perm, obj=None):
+            if obj is not None:
+                object_level_checks.append((perm, obj.pk))
+            return original_has_perm(self, user_obj, perm, obj=obj)
+
+        monkeypatch.setattr(ModelBackend, "has_perm", has_perm)
+
+        response = graphql_query(
+            self._PROJECT_QUERY,
+            variables={
+                "id": project.id,
+            },
+            client=client,
+        )
+
+        assert_graphql_response_has_no_errors(response)
+        content = response.json()
+        assert content["data"]["project"]["id"] == str(project.id)
+        assert len(content["data"]["project"]["expenses"]) == 0
+        assert object_level_checks == []
+
+    def test_active_superuser_sees_all_objects_without_permission_checks(
+        self, client: Client, monkeypatch
     ):
-        # Omit permission to view all expenses, which should restrict the ones shown to
-        # those that the user owns
-        user = UserFactory(
-            permissions=[
-                "tests.view_project",
-                "auth.view_user",
-            ],
+        """
+        Active superusers have every permission, so they should see all objects without
+        any permission checks being performed.
+        """
+        user = UserFactory(is_superuser=True)
+        client.force_login(user)
+
+        project = ProjectFactory()
+        create_expenses(2, project=project)
+
+        # Record permission checks via Django's standard `has_perm` (which the user model
+        # inherits), rather than overriding it on the user model, since the superuser
+        # shortcut only applies to user models that use the standard implementation
+        permission_checks = []
+        original_has_perm = PermissionsMixin.has_perm
+
+        def has_perm(self, perm, obj=None):
+            permission_checks.append(perm)
+            return original_has_perm(self, perm, obj=obj)
+
+        monkeypatch.setattr(PermissionsMixin, "has_perm", has_perm)
+
+        response = graphql_query(
+            self._PROJECT_QUERY,
+            variables={
+                "id": project.id,
+            },
+            client=client,
         )
+
+        assert_graphql_response_has_no_errors(response)
+        content = response.json()
+        project_in_response = content["data"]["project"]
+        assert project_in_response["id"] == str(project.id)
+        assert project_in_response["owner"] is not None
+        assert len(project_in_response["expenses"]) == 2
+        assert permission_checks == []
+
+    def test_superuser_is_checked_when_user_model_overrides_has_perm(self, monkeypatch):
+        """
+        The superuser shortcut relies on Django's standard `has_perm`, so if the user
+        model overrides it (here, denying everything, even to superusers), superusers
+        should be checked like any other user.
+        """
+        user = UserFactory(is_superuser=True)
+        project = ProjectFactory()
+
+        def has_perm(self, perm, obj=None):
+            return False
+
+        monkeypatch.setattr(User, "has_perm", has_perm)
+
+        assert not has_permission_to_view_model_object(user, project)
+
+    def test_superuser_is_filtered_when_user_model_overrides_has_perm(
+        self, client: Client, monkeypatch
+    ):
+        """
+        Superusers whose user model overrides `has_perm` shouldn't bypass authorization
+        in the middleware, so whatever that `has_perm` denies is omitted.
+        """
+        user = UserFactory(is_superuser=True)
         client.force_login(user)
 
-        # Create a couple projects and add expenses to them, including some owned by the
-        # requesting user
-        project1 = ProjectFactory()
-        ExpenseFactory.create_batch(3, project=project1)
-        ExpenseFactory.create_batch(2, project=project1, owner=user)
-        project2 = ProjectFactory()
-        ExpenseFactory.create_batch(2, project=project2)
-        ExpenseFactory.create_batch(2, project=project2, owner=user)
+        project = ProjectFactory()
+        create_expenses(2, project=project)
 
-        # The query-performance should be the same as it was when the user had all
-        # model-level sweeping permissions, since the authorization backend doesn't
-        # require any additional queries.
-        with django_assert_num_queries(6) as captured:
-            response = graphql_query(
-                query=self._projects_with_expenses_query(),
-                client=client,
-            )
+        # Deny access to projects, even for superusers
+        original_has_perm = User.has_perm
+
+        def has_perm(self, perm, obj=None):
+            if perm == "tests.view_project":
+                return False
+            return original_has_perm(self, perm, obj=obj)
+
+        monkeypatch.setattr(User, "has_perm", has_perm)
+
+        response = graphql_query(
+            self._PROJECT_QUERY,
+            variables={
+                "id": project.id,
+            },
+            client=client,
+        )
 
-        # Sanity-check that the response was valid
         assert_graphql_response_has_no_errors(response)
         content = response.json()
-        projects_in_response = content["data"]["projects"]
-        assert len(projects_in_response) == 2
-        # Expenses should contain only the ones owned by the user
-        assert len(projects_in_response[0]["expenses"]) == 2
-        assert len(projects_in_response[1]["expenses"]) == 2
+        assert content["data"]["project"] is None
 
-        # The SQL query performance should be the same as when a user has all
-        # permission, still optimized
-        self._assert_projects_with_expenses_sql_queries_match_expected(captured)
+    def test_inactive_superuser_is_filtered_like_other_users(self):
+        """
+        Inactive superusers don't get the superuser shortcut, and are only shown what
+        their permissions allow.
+        """
+        # Since Django won't log in an inactive user via the client, execute the query
+        # directly with the user set on the request
+        user = UserFactory(is_superuser=True, is_active=False)
+        project = ProjectFactory()
+        create_expenses(2, project=project)
+
+        result = execute_graphql_query(self._PROJECTS_WITH_EXPENSES_QUERY, user)
+
+        assert result.errors is None
+        assert result.data == {"projects": []}
+        assert not has_permission_to_view_model_object(user, project)
+
+    def test_leaf_fields_skip_authorization_but_plain_object_fields_do_not(
+        self, client: Client, monkeypatch
+    ):
+        """
+        Fields with scalar or enum types can't expose models, so they should skip the
+        authorization logic entirely, whereas fields with other object types (not just
+        DjangoObjectTypes) must still be authorized, since they may be resolved with
+        model objects.
+        """
+        # Exclude permissions to view projects
+        user = UserFactory(permissions=_VIEW_PERMISSIONS_EXCEPT_PROJECTS)
+        client.force_login(user)
+
+        project = ProjectFactory()
+
+        authorized_result_types = []
+        original_get_authorization_handler = middleware._get_authorization_handler
+
+        def get_authorization_handler(result_type):
+            authorized_result_types.append(result_type)
+            return original_get_authorization_handler(result_type)
+
+        monkeypatch.setattr(
+            middleware, "_get_authorization_handler", get_authorization_handler
+        )
+
+        response = graphql_query(
+            """
+            query ($id: ID!) {
+                projectName(id: $id)
+                projectStatus(id: $id)
+                projectSummary(id: $id) {
+                    name
+                }
+            }
+            """,
+            variables={
+                "id": project.id,
+            },
+            client=client,
+        )
+
+        assert_graphql_response_has_no_errors(response)
+        content = response.json()
+        assert content["data"]["projectName"] == project.name
+        assert content["data"]["projectStatus"] == "ACTIVE"
+        # The plain ObjectType field was resolved with a Project model object, which
+        # the user doesn't have permission to view
+        assert content["data"]["projectSummary"] is None
+        # Only the object-typed field should have reached the authorization logic
+        assert authorized_result_types == [Project]
+
+    @pytest.mark.parametrize("context", [None, {}, object()])
+    def test_model_free_fields_do_not_require_a_user_in_the_context(self, context):
+        """
+        Fields that don't resolve to model objects (like introspection fields) shouldn't
+        need a user in the context, since there's nothing to authorize.
+        """
+        result = schema.execute(
+            """
+            query {
+                projectStatus(id: 1)
+                __schema {
+                    queryType {
+                        name
+                    }
+                }
+            }
+            """,
+            context_value=context,
+            middleware=[GrapheneAuthorizationMiddleware()],
+        )
+
+        assert result.errors is None
+        assert result.data == {
+            "projectStatus": "ACTIVE",
+            "__schema": {"queryType": {"name": "Query"}},
+        }
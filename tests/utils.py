@@ -1,38 +1,93 @@
-import json
-from typing import Iterable
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
 
-from django.contrib.auth.models import Permission, User
-from django.http import HttpResponse
+from django.contrib.auth.models import AnonymousUser, Permission, User
+from django.test import RequestFactory
+from graphql import ExecutionResult
 
+from graphene_django_permissions.middleware import GrapheneAuthorizationMiddleware
+from tests.schema import schema
 
-def assert_graphql_response_has_no_errors(response: HttpResponse):
+if TYPE_CHECKING:
+    # The test client's responses, which (unlike a plain HttpResponse) can parse and
+    # cache their JSON content via `json()`
+    from django.test.client import _MonkeyPatchedWSGIResponse as TestResponse
+
+
+def assert_graphql_response_has_no_errors(response: "TestResponse"):
     assert (
         response.status_code == 200
     ), f"Response status unexpectedly {response.status_code}: {repr(response.content)}"
 
-    content = json.loads(response.content)
+    content = response.json()
     assert "errors" not in list(
         content.keys()
     ), f"Response unexpectedly contains errors: {content.get('errors')}"
 
 
-def assert_graphql_response_has_errors(response: HttpResponse):
-    content = json.loads(response.content)
+def assert_graphql_response_has_errors(response: "TestResponse"):
+    content = response.json()
     assert "errors" in list(
         content.keys()
     ), f"Response unexpectedly does NOT contain errors: {content}"
 
 
-def _get_permission_from_string(perm: str) -> Permission:
-    if "." not in perm:
-        raise ValueError(
-            f'Invalid permission "{perm}". Must be of the form'
-            ' <app_label.permission_codename>, like "polls.view_poll".'
+def execute_graphql_query(
+    query: str,
+    user: Union[User, AnonymousUser],
+    variables: Optional[Dict[str, Any]] = None,
+) -> ExecutionResult:
+    """
+    Execute the query against the test schema as the given user, with the authorization
+    middleware in place.
+
+    Unlike `graphql_query`, this calls the schema directly rather than going through the
+    test client and the Django view, so it skips the session and user lookups (and the
+    rest of the request/response handling) that aren't relevant to most permission
+    checks.
+    """
+    request = RequestFactory().post("/graphql")
+    request.user = user
+    return schema.execute(
+        query,
+        variable_values=variables,
+        context_value=request,
+        middleware=[GrapheneAuthorizationMiddleware()],
+    )
+
+
+# The primary keys of Permission objects, keyed by "<app_label>.<codename>", so that
+# granting the same permissions to multiple users within a test doesn't query for them
+# again. Since flushing the database recreates the Permission rows with new ids, this is
+# cleared before every test (see `conftest.py`).
+_PERMISSION_IDS_CACHE: Dict[str, int] = {}
+
+
+def _get_permission_ids_from_strings(perms: Iterable[str]) -> List[int]:
+    perms = list(perms)
+    for perm in perms:
+        if "." not in perm:
+            raise ValueError(
+                f'Invalid permission "{perm}". Must be of the form'
+                ' <app_label.permission_codename>, like "polls.view_poll".'
+            )
+
+    # Fetch any permissions we haven't seen yet with a single query, limited to the
+    # requested app labels and codenames (rather than loading every permission)
+    missing_perms = {perm for perm in perms if perm not in _PERMISSION_IDS_CACHE}
+    if missing_perms:
+        app_labels, codenames = zip(*(perm.split(".") for perm in missing_perms))
+        _PERMISSION_IDS_CACHE.update(
+            (f"{app_label}.{codename}", permission_id)
+            for app_label, codename, permission_id in Permission.objects.filter(
+                content_type__app_label__in=app_labels, codename__in=codenames
+            ).values_list("content_type__app_label", "codename", "id")
         )
 
-    app_label, codename = perm.split(".")
+    for perm in missing_perms:
+        if perm not in _PERMISSION_IDS_CACHE:
+            raise Permission.DoesNotExist(f'Permission "{perm}" does not exist.')
 
-    return Permission.objects.get(content_type__app_label=app_label, codename=codename)
+    return [_PERMISSION_IDS_CACHE[perm] for perm in perms]
 
 
 def add_permissions_for_user(user: User, permissions: Iterable[str]) -> None:
@@ -47,7 +102,4 @@ def add_permissions_for_user(user: User, permissions: Iterable[str]) -> None:
         A list of permissions the user should have, each a string of the form:
         <app_label.permission_codename>, like "polls.view_poll".
     """
-    permission_objects = [
-        _get_permission_from_string(permission_str) for permission_str in permissions
-    ]
-    user.user_permissions.add(*permission_objects)
+    user.user_permissions.add(*_get_permission_ids_from_strings(permissions))